@@ -3,21 +3,30 @@ Système de Gestion Locative
 Application Flask pour gérer la location d'un appartement et d'un local commercial
 """
 
-from flask import Flask, render_template, request, redirect, url_for, flash
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, g
+from flask.json.provider import JSONProvider
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy.orm import joinedload
-from sqlalchemy import func
+from sqlalchemy.orm import joinedload, raiseload
+from sqlalchemy import event, func, pool
+from collections import defaultdict
 from datetime import datetime, date
 from dateutil.relativedelta import relativedelta
 from pathlib import Path
+from types import SimpleNamespace
+import orjson
 import secrets
 import sys
 import os
+import time
 
 db = SQLAlchemy()
 
 # ==================== CONSTANTES ====================
 
+# Version du schéma de la base (PRAGMA user_version), à incrémenter
+# à chaque nouvelle migration dans _migrate_db()
+SCHEMA_VERSION = 1
+
 CATEGORIES_PAIEMENT = [
     ('loyer', 'Loyer'),
     ('eau_assainissement', 'Eau et assainissement'),
@@ -25,6 +34,8 @@ CATEGORIES_PAIEMENT = [
     ('taxe_fonciere', 'Taxe foncière'),
 ]
 
+CATEGORIES_PAIEMENT_DICT = dict(CATEGORIES_PAIEMENT)
+
 MOIS_NOMS = ['', 'Janvier', 'Février', 'Mars', 'Avril', 'Mai', 'Juin',
              'Juillet', 'Août', 'Septembre', 'Octobre', 'Novembre', 'Décembre']
 
@@ -50,6 +61,85 @@ def _get_data_dir():
     return data_dir
 
 
+class ORJSONProvider(JSONProvider):
+    """Sérialisation JSON de l'application via orjson."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(
+            obj,
+            default=str,
+            option=orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+        ).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+def _get_secret_key(data_dir):
+    """Clé secrète Flask, générée au premier lancement puis conservée."""
+    key_path = os.path.join(data_dir, 'secret.key')
+    try:
+        # Création exclusive, directement en 0600 : jamais lisible par les
+        # autres utilisateurs, et un seul processus écrit la clé
+        fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        # Le fichier peut être encore vide si un autre processus vient de le
+        # créer : on relit brièvement avant de le considérer comme corrompu
+        for _ in range(50):
+            with open(key_path, 'rb') as f:
+                key = f.read()
+            if key:
+                return key
+            time.sleep(0.01)
+        os.remove(key_path)
+        return _get_secret_key(data_dir)
+    key = secrets.token_bytes(32)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(key)
+    return key
+
+
+def _engine_options():
+    """Options du moteur SQLAlchemy (pool de connexions SQLite).
+
+    La variable d'environnement POOLCLASS permet de choisir une autre classe
+    de ``sqlalchemy.pool`` (par exemple ``StaticPool`` pour les tests).
+    """
+    options = {
+        'connect_args': {'check_same_thread': False, 'timeout': 30},
+        'pool_pre_ping': True,
+    }
+    poolclass = os.environ.get('POOLCLASS')
+    if poolclass and poolclass != 'QueuePool':
+        classe = getattr(pool, poolclass, None)
+        if not (isinstance(classe, type) and issubclass(classe, pool.Pool)):
+            raise ValueError(
+                f"POOLCLASS={poolclass!r} n'est pas une classe de sqlalchemy.pool "
+                "(ex. StaticPool, NullPool, QueuePool)."
+            )
+        options['poolclass'] = classe
+    else:
+        options.update({
+            'pool_size': 10,
+            'max_overflow': 20,
+            'pool_timeout': 30,
+            'pool_recycle': 1800,
+        })
+    return options
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Réglages SQLite appliqués à chaque nouvelle connexion."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute('PRAGMA temp_store=MEMORY')
+    cursor.execute('PRAGMA mmap_size=134217728')
+    cursor.execute('PRAGMA cache_size=-20000')
+    cursor.execute('PRAGMA foreign_keys=ON')
+    cursor.close()
+
+
 def _safe_float(value, default=None):
     if not value:
         return default
@@ -68,11 +158,15 @@ def _safe_int(value, default=None):
         return default
 
 
-def _safe_date(value, fmt='%Y-%m-%d'):
+def _safe_date(value, fmt=None):
     if not value:
         return None
     try:
-        return datetime.strptime(value, fmt).date()
+        # fromisoformat accepte plus de formes selon la version de Python
+        # ('20240105', '2024-W01-1' en 3.11+) : on le limite à AAAA-MM-JJ
+        if (fmt is None or fmt == '%Y-%m-%d') and len(value) == 10 and value[4] == value[7] == '-':
+            return date.fromisoformat(value)
+        return datetime.strptime(value, fmt or '%Y-%m-%d').date()
     except (ValueError, TypeError):
         return None
 
@@ -108,16 +202,21 @@ def _parse_locataire_form(form):
     }
 
 
+def _bien_type(bien_id):
+    """Type d'un bien, lu sans charger l'objet complet."""
+    return db.session.query(Bien.type_bien).filter_by(id=bien_id).scalar()
+
+
 def _validate_locataire_data(data):
     if not data['bien_id']:
         return 'Veuillez sélectionner un bien.'
 
     # Déterminer le type de bien pour adapter la validation
-    bien = Bien.query.get(data['bien_id'])
-    if not bien:
+    type_bien = _bien_type(data['bien_id'])
+    if type_bien is None:
         return 'Le bien sélectionné est introuvable.'
 
-    if bien.type_bien == 'local_commercial':
+    if type_bien == 'local_commercial':
         # Validation locataire professionnel
         if not data.get('raison_sociale'):
             return 'La raison sociale est obligatoire pour un local commercial.'
@@ -151,6 +250,92 @@ def _validate_locataire_data(data):
     return None
 
 
+def _nom_complet(nom, prenom, raison_sociale):
+    if raison_sociale:
+        return raison_sociale
+    return f'{prenom} {nom}'
+
+
+def _locataires_actifs_choix():
+    """Locataires actifs réduits aux champs affichés dans les listes de choix."""
+    lignes = db.session.query(
+        Locataire.id,
+        Locataire.nom,
+        Locataire.prenom,
+        Locataire.raison_sociale,
+        Locataire.loyer_mensuel,
+        Bien.nom,
+        Bien.charges_mensuelles,
+    ).join(Bien, Locataire.bien_id == Bien.id
+    ).filter(Locataire.actif == True
+    ).order_by(Locataire.nom).all()
+    return [
+        SimpleNamespace(
+            id=id_,
+            nom_complet=_nom_complet(nom, prenom, raison_sociale),
+            loyer_total=loyer_mensuel + (charges or 0),
+            bien_nom=bien_nom,
+        )
+        for id_, nom, prenom, raison_sociale, loyer_mensuel, bien_nom, charges in lignes
+    ]
+
+
+def _bailleur():
+    """Bailleur (paramètres), chargé une seule fois par requête."""
+    if 'bailleur' not in g:
+        g.bailleur = Bailleur.query.first()
+    return g.bailleur
+
+
+def _biens():
+    """Liste des biens, chargée une seule fois par requête."""
+    if 'biens' not in g:
+        g.biens = Bien.query.all()
+    return g.biens
+
+
+def _paiements_lignes(limit, offset=0, mois=None):
+    """Page de paiements (plus récents d'abord) avec locataire et bien, sans hydratation ORM."""
+    query = db.session.query(
+        Paiement.id,
+        Paiement.montant,
+        Paiement.date_paiement,
+        Paiement.mois_concerne,
+        Paiement.categorie,
+        Paiement.mode_paiement,
+        Paiement.locataire_id,
+        Locataire.nom,
+        Locataire.prenom,
+        Locataire.raison_sociale,
+        Bien.id,
+        Bien.nom,
+        Bien.type_bien,
+    ).select_from(Paiement
+    ).join(Locataire, Paiement.locataire_id == Locataire.id
+    ).join(Bien, Locataire.bien_id == Bien.id)
+    if mois:
+        query = query.filter(Paiement.mois_concerne == mois)
+    lignes = query.order_by(Paiement.date_paiement.desc(), Paiement.id.desc()
+    ).limit(limit).offset(offset).all()
+    return [
+        SimpleNamespace(
+            id=id_,
+            montant=montant,
+            date_paiement=date_paiement,
+            mois_concerne=mois_concerne,
+            categorie=categorie,
+            mode_paiement=mode_paiement,
+            locataire_id=locataire_id,
+            locataire_nom=_nom_complet(nom, prenom, raison_sociale),
+            bien_id=bien_id,
+            bien_nom=bien_nom,
+            bien_type=type_bien,
+        )
+        for (id_, montant, date_paiement, mois_concerne, categorie, mode_paiement,
+             locataire_id, nom, prenom, raison_sociale, bien_id, bien_nom, type_bien) in lignes
+    ]
+
+
 def _parse_paiement_form(form):
     return {
         'locataire_id': _safe_int(form.get('locataire_id')),
@@ -201,6 +386,10 @@ class Bien(db.Model):
 
 
 class Locataire(db.Model):
+    __table_args__ = (
+        db.Index('ix_locataire_actif_bien', 'actif', 'bien_id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     nom = db.Column(db.String(100), nullable=False)
     prenom = db.Column(db.String(100))
@@ -217,9 +406,9 @@ class Locataire(db.Model):
     date_debut_bail = db.Column(db.Date, nullable=False)
     date_fin_bail = db.Column(db.Date)
     loyer_mensuel = db.Column(db.Float, nullable=False)
-    depot_garantie = db.Column(db.Float, default=0)
-    jour_paiement = db.Column(db.Integer, default=1)
-    actif = db.Column(db.Boolean, default=True)
+    depot_garantie = db.Column(db.Float, default=0, server_default='0')
+    jour_paiement = db.Column(db.Integer, default=1, server_default='1')
+    actif = db.Column(db.Boolean, default=True, server_default='1')
 
     paiements = db.relationship('Paiement', backref='locataire', lazy=True, cascade='all, delete-orphan')
 
@@ -230,9 +419,7 @@ class Locataire(db.Model):
 
     @property
     def nom_complet(self):
-        if self.raison_sociale:
-            return self.raison_sociale
-        return f'{self.prenom} {self.nom}'
+        return _nom_complet(self.nom, self.prenom, self.raison_sociale)
 
     @property
     def est_professionnel(self):
@@ -266,6 +453,11 @@ class Bailleur(db.Model):
 
 
 class Paiement(db.Model):
+    __table_args__ = (
+        db.Index('ix_paiement_mois_loc', 'mois_concerne', 'locataire_id'),
+        db.Index('ix_paiement_locataire_date', 'locataire_id', 'date_paiement'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     locataire_id = db.Column(db.Integer, db.ForeignKey('locataire.id'), nullable=False)
     montant = db.Column(db.Float, nullable=False)
@@ -274,15 +466,14 @@ class Paiement(db.Model):
     categorie = db.Column(db.String(50), nullable=False, default='loyer')
     mode_paiement = db.Column(db.String(50))
     commentaire = db.Column(db.Text)
-    quittance_generee = db.Column(db.Boolean, default=False)
+    quittance_generee = db.Column(db.Boolean, default=False, server_default='0')
 
     def __repr__(self):
         return f'<Paiement {self.montant}€ - {self.categorie} - {self.mois_concerne}>'
 
     @property
     def categorie_label(self):
-        labels = dict(CATEGORIES_PAIEMENT)
-        return labels.get(self.categorie, self.categorie)
+        return CATEGORIES_PAIEMENT_DICT.get(self.categorie, self.categorie)
 
 
 # ==================== APPLICATION FACTORY ====================
@@ -294,11 +485,15 @@ def create_app():
     db_path = os.path.join(data_dir, 'gestion_locative.db')
 
     app = Flask(__name__, template_folder=template_folder)
-    app.config['SECRET_KEY'] = secrets.token_hex(32)
+    app.json = ORJSONProvider(app)
+    app.config['SECRET_KEY'] = _get_secret_key(data_dir)
     app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = _engine_options()
 
     db.init_app(app)
+    with app.app_context():
+        event.listen(db.engine, 'connect', _set_sqlite_pragmas)
 
     _register_routes(app)
     return app
@@ -311,28 +506,42 @@ def _register_routes(app):
 
     @app.route('/')
     def index():
-        biens = Bien.query.all()
+        # Relations chargées explicitement, tout autre accès lève une erreur
+        biens = Bien.query.options(
+            joinedload(Bien.locataires).lazyload(Locataire.bien),
+            raiseload('*')
+        ).all()
         locataires_actifs = Locataire.query.filter_by(actif=True).options(
             joinedload(Locataire.bien),
-            joinedload(Locataire.paiements)
+            raiseload('*')
         ).all()
 
-        revenus_mensuels = sum(loc.loyer_total for loc in locataires_actifs)
+        revenus_mensuels = db.session.query(
+            func.coalesce(func.sum(
+                Locataire.loyer_mensuel + func.coalesce(Bien.charges_mensuelles, 0)
+            ), 0)
+        ).join(Bien, Locataire.bien_id == Bien.id
+        ).filter(Locataire.actif == True).scalar()
 
         mois_actuel = date.today().strftime('%Y-%m')
-        paiements_mois = Paiement.query.filter_by(mois_concerne=mois_actuel).all()
-        total_percu = sum(p.montant for p in paiements_mois)
+        total_percu = db.session.query(
+            func.coalesce(func.sum(Paiement.montant), 0)
+        ).filter_by(mois_concerne=mois_actuel).scalar()
+
+        # Couples (locataire, mois) de loyer payés, en une seule requête
+        mois_payes = set(db.session.query(
+            Paiement.locataire_id,
+            Paiement.mois_concerne
+        ).join(Locataire, Paiement.locataire_id == Locataire.id
+        ).filter(
+            Locataire.actif == True,
+            Paiement.categorie == 'loyer'
+        ).distinct().all())
 
         # Calculer les mois impayés pour chaque locataire actif
         aujourd_hui = date.today()
         loyers_en_retard = []
         for loc in locataires_actifs:
-            # Mois avec un paiement de loyer
-            mois_payes = set(
-                p.mois_concerne for p in loc.paiements
-                if p.categorie == 'loyer'
-            )
-
             # Période : du début du bail jusqu'au mois actuel
             debut = loc.date_debut_bail
             mois_cursor = date(debut.year, debut.month, 1)
@@ -344,7 +553,7 @@ def _register_routes(app):
                 # Le mois courant n'est en retard que si le jour de paiement est passé
                 if mois_cursor == mois_fin and aujourd_hui.day <= loc.jour_paiement:
                     break
-                if mois_str not in mois_payes:
+                if (loc.id, mois_str) not in mois_payes:
                     mois_impayes.append(mois_str)
                 mois_cursor += relativedelta(months=1)
 
@@ -371,7 +580,7 @@ def _register_routes(app):
 
     @app.route('/biens')
     def liste_biens():
-        biens = Bien.query.all()
+        biens = _biens()
         return render_template('biens/liste.html', biens=biens)
 
     @app.route('/biens/ajouter', methods=['GET', 'POST'])
@@ -388,8 +597,7 @@ def _register_routes(app):
                 flash('Les charges mensuelles ne peuvent pas être négatives.', 'danger')
                 return render_template('biens/formulaire.html', bien=None)
             try:
-                bien = Bien(**data)
-                db.session.add(bien)
+                db.session.execute(Bien.__table__.insert().values(**data))
                 db.session.commit()
                 flash('Bien ajouté avec succès !', 'success')
                 return redirect(url_for('liste_biens'))
@@ -401,12 +609,12 @@ def _register_routes(app):
 
     @app.route('/biens/<int:id>')
     def detail_bien(id):
-        bien = Bien.query.get_or_404(id)
+        bien = db.get_or_404(Bien, id)
         return render_template('biens/detail.html', bien=bien)
 
     @app.route('/biens/<int:id>/modifier', methods=['GET', 'POST'])
     def modifier_bien(id):
-        bien = Bien.query.get_or_404(id)
+        bien = db.get_or_404(Bien, id)
         if request.method == 'POST':
             data = _parse_bien_form(request.form)
             if not data['nom']:
@@ -432,7 +640,7 @@ def _register_routes(app):
 
     @app.route('/biens/<int:id>/supprimer', methods=['POST'])
     def supprimer_bien(id):
-        bien = Bien.query.get_or_404(id)
+        bien = db.get_or_404(Bien, id)
         try:
             db.session.delete(bien)
             db.session.commit()
@@ -451,7 +659,7 @@ def _register_routes(app):
 
     @app.route('/locataires/ajouter', methods=['GET', 'POST'])
     def ajouter_locataire():
-        biens = Bien.query.all()
+        biens = _biens()
         if request.method == 'POST':
             data = _parse_locataire_form(request.form)
             erreur = _validate_locataire_data(data)
@@ -459,8 +667,7 @@ def _register_routes(app):
                 flash(erreur, 'danger')
                 return render_template('locataires/formulaire.html', locataire=None, biens=biens)
             try:
-                locataire = Locataire(**data, actif=True)
-                db.session.add(locataire)
+                db.session.execute(Locataire.__table__.insert().values(**data, actif=True))
                 db.session.commit()
                 flash('Locataire ajouté avec succès !', 'success')
                 return redirect(url_for('liste_locataires'))
@@ -472,14 +679,14 @@ def _register_routes(app):
 
     @app.route('/locataires/<int:id>')
     def detail_locataire(id):
-        locataire = Locataire.query.get_or_404(id)
+        locataire = db.get_or_404(Locataire, id)
         paiements = Paiement.query.filter_by(locataire_id=id).order_by(Paiement.date_paiement.desc()).all()
         return render_template('locataires/detail.html', locataire=locataire, paiements=paiements)
 
     @app.route('/locataires/<int:id>/modifier', methods=['GET', 'POST'])
     def modifier_locataire(id):
-        locataire = Locataire.query.get_or_404(id)
-        biens = Bien.query.all()
+        locataire = db.get_or_404(Locataire, id)
+        biens = _biens()
         if request.method == 'POST':
             data = _parse_locataire_form(request.form)
             erreur = _validate_locataire_data(data)
@@ -501,7 +708,7 @@ def _register_routes(app):
 
     @app.route('/locataires/<int:id>/supprimer', methods=['POST'])
     def supprimer_locataire(id):
-        locataire = Locataire.query.get_or_404(id)
+        locataire = db.get_or_404(Locataire, id)
         try:
             db.session.delete(locataire)
             db.session.commit()
@@ -515,12 +722,25 @@ def _register_routes(app):
 
     @app.route('/paiements')
     def liste_paiements():
-        paiements = Paiement.query.order_by(Paiement.date_paiement.desc()).all()
-        return render_template('paiements/liste.html', paiements=paiements)
+        taille = min(max(_safe_int(request.args.get('size'), 50), 1), 200)
+        nb_paiements, total_paiements = db.session.query(
+            func.count(Paiement.id),
+            func.coalesce(func.sum(Paiement.montant), 0)
+        ).one()
+        nb_pages = max((nb_paiements + taille - 1) // taille, 1)
+        page = min(max(_safe_int(request.args.get('page'), 1), 1), nb_pages)
+
+        paiements = _paiements_lignes(taille, (page - 1) * taille)
+        return render_template('paiements/liste.html',
+                             paiements=paiements,
+                             total_paiements=total_paiements,
+                             page=page,
+                             nb_pages=nb_pages,
+                             taille=taille)
 
     @app.route('/paiements/ajouter', methods=['GET', 'POST'])
     def ajouter_paiement():
-        locataires = Locataire.query.filter_by(actif=True).all()
+        locataires = _locataires_actifs_choix()
         if request.method == 'POST':
             data = _parse_paiement_form(request.form)
             erreur = _validate_paiement_data(data)
@@ -528,8 +748,7 @@ def _register_routes(app):
                 flash(erreur, 'danger')
                 return render_template('paiements/formulaire.html', paiement=None, locataires=locataires, categories=CATEGORIES_PAIEMENT)
             try:
-                paiement = Paiement(**data)
-                db.session.add(paiement)
+                db.session.execute(Paiement.__table__.insert().values(**data))
                 db.session.commit()
                 flash('Paiement enregistré avec succès !', 'success')
                 return redirect(url_for('liste_paiements'))
@@ -541,8 +760,8 @@ def _register_routes(app):
 
     @app.route('/paiements/<int:id>/modifier', methods=['GET', 'POST'])
     def modifier_paiement(id):
-        paiement = Paiement.query.get_or_404(id)
-        locataires = Locataire.query.filter_by(actif=True).all()
+        paiement = db.get_or_404(Paiement, id)
+        locataires = _locataires_actifs_choix()
         if request.method == 'POST':
             data = _parse_paiement_form(request.form)
             erreur = _validate_paiement_data(data)
@@ -563,7 +782,7 @@ def _register_routes(app):
 
     @app.route('/paiements/<int:id>/supprimer', methods=['POST'])
     def supprimer_paiement(id):
-        paiement = Paiement.query.get_or_404(id)
+        paiement = db.get_or_404(Paiement, id)
         try:
             db.session.delete(paiement)
             db.session.commit()
@@ -577,37 +796,31 @@ def _register_routes(app):
 
     @app.route('/quittances')
     def liste_quittances():
-        locataires = Locataire.query.filter_by(actif=True).all()
+        locataires = _locataires_actifs_choix()
         now = date.today().strftime('%Y-%m')
         return render_template('quittances/liste.html', locataires=locataires, now=now)
 
     @app.route('/quittances/generer/<int:locataire_id>/<mois>')
     def generer_quittance(locataire_id, mois):
-        locataire = Locataire.query.get_or_404(locataire_id)
+        locataire = db.get_or_404(Locataire, locataire_id)
 
         try:
-            parts = mois.split('-')
-            if len(parts) != 2:
-                raise ValueError
-            annee = parts[0]
-            mois_num = int(parts[1])
-            int(annee)
-            if mois_num < 1 or mois_num > 12:
+            if len(mois) != 7:
                 raise ValueError
-        except (ValueError, AttributeError):
+            debut_mois = date.fromisoformat(f'{mois}-01')
+        except ValueError:
             flash('Format de mois invalide.', 'danger')
             return redirect(url_for('liste_quittances'))
+        annee, mois_num = str(debut_mois.year), debut_mois.month
 
-        bailleur = Bailleur.query.first()
+        bailleur = _bailleur()
         paiements = Paiement.query.filter_by(locataire_id=locataire_id, mois_concerne=mois).all()
 
-        paiements_par_categorie = {}
+        paiements_par_categorie = defaultdict(list)
+        total_paiements = 0.0
         for p in paiements:
-            if p.categorie not in paiements_par_categorie:
-                paiements_par_categorie[p.categorie] = []
             paiements_par_categorie[p.categorie].append(p)
-
-        total_paiements = sum(p.montant for p in paiements)
+            total_paiements += p.montant
         mois_nom = MOIS_NOMS[mois_num]
 
         return render_template('quittances/quittance.html',
@@ -616,7 +829,7 @@ def _register_routes(app):
                              paiements=paiements,
                              paiements_par_categorie=paiements_par_categorie,
                              total_paiements=total_paiements,
-                             categories_labels=dict(CATEGORIES_PAIEMENT),
+                             categories_labels=CATEGORIES_PAIEMENT_DICT,
                              mois=mois,
                              mois_nom=mois_nom,
                              annee=annee,
@@ -626,7 +839,7 @@ def _register_routes(app):
 
     @app.route('/parametres', methods=['GET', 'POST'])
     def parametres():
-        bailleur = Bailleur.query.first()
+        bailleur = _bailleur()
         if request.method == 'POST':
             try:
                 nom = request.form.get('nom', '').strip()
@@ -660,6 +873,28 @@ def _register_routes(app):
                 flash("Erreur lors de l'enregistrement des paramètres.", 'danger')
         return render_template('parametres.html', bailleur=bailleur)
 
+    # ==================== ROUTES API ====================
+
+    @app.route('/api/paiements.json')
+    def api_paiements():
+        taille = min(max(_safe_int(request.args.get('size'), 50), 1), 200)
+        page = max(_safe_int(request.args.get('page'), 1), 1)
+        mois = request.args.get('mois') or None
+
+        paiements = _paiements_lignes(taille, (page - 1) * taille, mois=mois)
+        return jsonify([
+            {
+                'id': p.id,
+                'montant': p.montant,
+                'date': p.date_paiement.isoformat(),
+                'mois': p.mois_concerne,
+                'categorie': p.categorie,
+                'locataire_id': p.locataire_id,
+                'locataire_nom': p.locataire_nom,
+            }
+            for p in paiements
+        ])
+
     # ==================== ROUTES STATISTIQUES ====================
 
     @app.route('/statistiques')
@@ -704,41 +939,40 @@ def _register_routes(app):
                 'type_bien': bien.type_bien,
                 'mois': {}
             }
+        totaux_par_mois = {}
         for mois_c, bien_id, nom, type_bien, total in revenus_par_bien_bruts:
             if bien_id in revenus_par_bien:
-                revenus_par_bien[bien_id]['mois'][mois_c] = float(total or 0)
+                total = float(total or 0)
+                revenus_par_bien[bien_id]['mois'][mois_c] = total
+                totaux_par_mois[mois_c] = totaux_par_mois.get(mois_c, 0) + total
 
         # Labels des 12 mois de l'année
-        mois_labels = []
-        mois_keys = []
-        for m in range(1, 13):
-            mois_labels.append(MOIS_NOMS_COURTS[m])
-            mois_keys.append(f'{annee}-{m:02d}')
+        mois_labels = MOIS_NOMS_COURTS[1:]
+        mois_keys = [f'{annee}-{m:02d}' for m in range(1, 13)]
 
         # Revenus mensuels globaux (pour le résumé)
-        revenus_mensuels = []
-        for i, mois_str in enumerate(mois_keys):
-            total = sum(
-                revenus_par_bien[bid]['mois'].get(mois_str, 0)
-                for bid in revenus_par_bien
-            )
-            revenus_mensuels.append({
-                'mois': mois_labels[i],
-                'total': total
-            })
+        revenus_mensuels = [
+            {'mois': label, 'total': totaux_par_mois.get(mois_str, 0)}
+            for label, mois_str in zip(mois_labels, mois_keys)
+        ]
 
         # Stats par bien (occupancy, totaux)
         biens_stats = []
-        biens = Bien.query.options(joinedload(Bien.locataires)).all()
+        biens = Bien.query.options(
+            joinedload(Bien.locataires).lazyload(Locataire.bien),
+            raiseload('*')
+        ).all()
 
-        totaux_par_locataire = dict(db.session.query(
-            Paiement.locataire_id,
-            func.sum(Paiement.montant)
-        ).group_by(Paiement.locataire_id).all())
+        totaux_par_bien = dict(db.session.query(
+            Locataire.bien_id,
+            func.coalesce(func.sum(Paiement.montant), 0)
+        ).join(Paiement, Paiement.locataire_id == Locataire.id
+        ).filter(Locataire.actif == True
+        ).group_by(Locataire.bien_id).all())
 
         for bien in biens:
             locataire = bien.locataire_actuel
-            total_percu = totaux_par_locataire.get(locataire.id, 0) or 0 if locataire else 0
+            total_percu = totaux_par_bien.get(bien.id, 0) if locataire else 0
             biens_stats.append({
                 'bien': bien,
                 'locataire': locataire,
@@ -759,22 +993,37 @@ def _register_routes(app):
 # ==================== INITIALISATION ====================
 
 def _migrate_db():
-    """Ajoute les colonnes manquantes pour les mises à jour."""
+    """Ajoute les colonnes et index manquants pour les mises à jour.
+
+    La version du schéma est conservée dans ``PRAGMA user_version`` : une base
+    déjà à jour n'est pas réinspectée au démarrage.
+    """
     from sqlalchemy import inspect, text
-    inspector = inspect(db.engine)
-    if 'locataire' in inspector.get_table_names():
-        colonnes = [col['name'] for col in inspector.get_columns('locataire')]
-        migrations = {
-            'raison_sociale': 'VARCHAR(200)',
-            'siret': 'VARCHAR(14)',
-            'dirigeant': 'VARCHAR(200)',
-        }
-        for col_name, col_type in migrations.items():
-            if col_name not in colonnes:
-                db.session.execute(text(
-                    f'ALTER TABLE locataire ADD COLUMN {col_name} {col_type}'
-                ))
-        db.session.commit()
+    with db.engine.begin() as conn:
+        version = conn.execute(text('PRAGMA user_version')).scalar()
+        if version >= SCHEMA_VERSION:
+            return
+
+        inspector = inspect(conn)
+        if 'locataire' in inspector.get_table_names():
+            colonnes = [col['name'] for col in inspector.get_columns('locataire')]
+            migrations = {
+                'raison_sociale': 'VARCHAR(200)',
+                'siret': 'VARCHAR(14)',
+                'dirigeant': 'VARCHAR(200)',
+            }
+            for col_name, col_type in migrations.items():
+                if col_name not in colonnes:
+                    conn.execute(text(
+                        f'ALTER TABLE locataire ADD COLUMN {col_name} {col_type}'
+                    ))
+
+        # Index absents des bases créées avant leur déclaration sur les modèles
+        for model in (Locataire, Paiement):
+            for index in model.__table__.indexes:
+                index.create(conn, checkfirst=True)
+
+        conn.execute(text(f'PRAGMA user_version = {SCHEMA_VERSION}'))
 
 
 def init_db(app):
@@ -784,25 +1033,25 @@ def init_db(app):
         _migrate_db()
 
         if Bien.query.first() is None:
-            appartement = Bien(
-                nom="Appartement Centre-Ville",
-                type_bien="appartement",
-                adresse="12 rue de la République, 75001 Paris",
-                surface=65.0,
-                description="Appartement T3 lumineux avec balcon",
-                charges_mensuelles=150.0,
-                date_acquisition=date(2020, 1, 15)
-            )
-            local = Bien(
-                nom="Local Commercial",
-                type_bien="local_commercial",
-                adresse="45 avenue des Champs, 75008 Paris",
-                surface=120.0,
-                description="Local commercial avec vitrine, idéal commerce de proximité",
-                charges_mensuelles=200.0,
-                date_acquisition=date(2018, 6, 1)
-            )
-            db.session.add(appartement)
-            db.session.add(local)
+            db.session.execute(Bien.__table__.insert(), [
+                dict(
+                    nom="Appartement Centre-Ville",
+                    type_bien="appartement",
+                    adresse="12 rue de la République, 75001 Paris",
+                    surface=65.0,
+                    description="Appartement T3 lumineux avec balcon",
+                    charges_mensuelles=150.0,
+                    date_acquisition=date(2020, 1, 15)
+                ),
+                dict(
+                    nom="Local Commercial",
+                    type_bien="local_commercial",
+                    adresse="45 avenue des Champs, 75008 Paris",
+                    surface=120.0,
+                    description="Local commercial avec vitrine, idéal commerce de proximité",
+                    charges_mensuelles=200.0,
+                    date_acquisition=date(2018, 6, 1)
+                ),
+            ])
             db.session.commit()
             print("Base de données initialisée avec les biens de démonstration.")
@@ -1,47 +1,139 @@
 """Entry point pour lancer Gestion Locative."""
 
+import logging
+import os
 import socket
+import subprocess
+import sys
 import threading
-import webbrowser
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 from gestion_locative.app import create_app, init_db
 
+logger = logging.getLogger(__name__)
 
-def _find_free_port(start=5000, end=5100):
-    """Trouve un port libre en commençant par 5000."""
-    for port in range(start, end):
+_SEPARATEUR = "=" * 50
+
+BANNER = (
+    "\n"
+    f"{_SEPARATEUR}\n"
+    "  GESTION LOCATIVE\n"
+    f"{_SEPARATEUR}\n"
+    "\n"
+    "  → http://127.0.0.1:{port}\n"
+    "\n"
+    "  Ctrl+C pour arrêter\n"
+    f"{_SEPARATEUR}\n"
+    "\n"
+)
+
+
+def _find_free_port(start=None, end=None):
+    """Trouve un port libre attribué par le système.
+
+    Si ``start`` est fourni, ce port est essayé une fois avant de se replier
+    sur un port éphémère. ``end`` est conservé pour compatibilité.
+    """
+    if start is not None:
         try:
             with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                s.bind(('127.0.0.1', port))
-                return port
+                s.bind(('127.0.0.1', start))
+                return start
         except OSError:
-            continue
-    return start
+            pass
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _wait_for_server(port, timeout=5.0, stop_event=None):
+    """Attend que le serveur accepte les connexions (sondage toutes les 25 ms)."""
+    stop_event = stop_event or threading.Event()
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and not stop_event.is_set():
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            s.settimeout(0.05)
+            try:
+                s.connect(('127.0.0.1', port))
+                return True
+            except OSError:
+                pass
+        stop_event.wait(0.025)
+    return False
+
+
+def _launch_url(url):
+    """Ouvre l'URL avec le lanceur natif du système."""
+    if sys.platform == 'win32':
+        os.startfile(url)
+        return
+    command = ['open', url] if sys.platform == 'darwin' else ['xdg-open', url]
+    try:
+        # Nouvelle session : un Ctrl+C sur le serveur n'atteint pas le lanceur
+        # ni le navigateur qu'il démarre
+        proc = subprocess.Popen(command, stdout=subprocess.DEVNULL,
+                                stderr=subprocess.DEVNULL, start_new_session=True)
+    except OSError:
+        # Lanceur absent (Linux minimal) : recherche de navigateur de la stdlib
+        import webbrowser
+        webbrowser.open(url)
+        return
+    # Récupère le processus fini (pas de zombie) sans bloquer l'arrêt du serveur
+    threading.Thread(target=proc.wait, daemon=True).start()
 
 
-def _open_browser(port):
-    """Ouvre le navigateur après un court délai."""
-    time.sleep(1.5)
-    webbrowser.open(f'http://127.0.0.1:{port}')
+def _log_browser_error(future):
+    """Signale l'échec de l'ouverture du navigateur (sinon perdu dans le futur)."""
+    if future.cancelled():
+        return
+    exc = future.exception()
+    if exc is not None:
+        logger.error("Impossible d'ouvrir le navigateur", exc_info=exc)
+
+
+def _open_browser(port, ready_event, stop_event):
+    """Ouvre le navigateur dès que le serveur répond, sauf si l'arrêt est demandé."""
+    ready_event.wait(timeout=5.0)
+    if stop_event.is_set():
+        return
+    _wait_for_server(port, stop_event=stop_event)
+    if not stop_event.is_set():
+        _launch_url(f'http://127.0.0.1:{port}')
+
+
+def _serve(app, port):
+    """Sert l'application avec waitress (ou werkzeug via GESTION_LOCATIVE_SERVER)."""
+    server = os.environ.get('GESTION_LOCATIVE_SERVER', 'waitress')
+    if server == 'werkzeug':
+        app.run(host='127.0.0.1', port=port, debug=False, use_reloader=False)
+        return
+    from waitress import serve
+    serve(app, host='127.0.0.1', port=port, threads=4, _quiet=True)
 
 
 def main():
     """Lance l'application Gestion Locative."""
     port = _find_free_port()
-    app = create_app()
-    init_db(app)
-
-    print()
-    print("=" * 50)
-    print("  GESTION LOCATIVE")
-    print("=" * 50)
-    print()
-    print(f"  → http://127.0.0.1:{port}")
-    print()
-    print("  Ctrl+C pour arrêter")
-    print("=" * 50)
-    print()
-
-    threading.Thread(target=_open_browser, args=(port,), daemon=True).start()
-    app.run(host='127.0.0.1', port=port, debug=False, use_reloader=False)
+    ready_event = threading.Event()
+    stop_event = threading.Event()
+
+    # Le thread du navigateur est libéré dès que le serveur s'arrête ou
+    # que l'initialisation échoue
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix='browser-open') as executor:
+        future = executor.submit(_open_browser, port, ready_event, stop_event)
+        future.add_done_callback(_log_browser_error)
+        try:
+            app = create_app()
+            init_db(app)
+            ready_event.set()
+
+            sys.stdout.write(BANNER.format(port=port))
+            sys.stdout.flush()
+
+            _serve(app, port)
+        finally:
+            stop_event.set()
+            ready_event.set()
+            future.cancel()
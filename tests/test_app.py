@@ -0,0 +1,46 @@
+"""Tests des pages d'analyse (tableau de bord et statistiques)."""
+
+from datetime import date
+
+import pytest
+
+from gestion_locative.app import create_app, init_db
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setenv('HOME', str(tmp_path))
+    app = create_app()
+    app.config['TESTING'] = True
+    init_db(app)
+    client = app.test_client()
+
+    # Biens de démonstration créés par init_db : un locataire et un paiement
+    reponse = client.post('/locataires/ajouter', data={
+        'nom': 'Dupont',
+        'prenom': 'Jean',
+        'bien_id': '1',
+        'date_debut_bail': '2024-01-01',
+        'loyer_mensuel': '800',
+        'jour_paiement': '5',
+    })
+    assert reponse.status_code == 302
+    reponse = client.post('/paiements/ajouter', data={
+        'locataire_id': '1',
+        'montant': '950',
+        'date_paiement': date.today().isoformat(),
+        'mois_concerne': date.today().strftime('%Y-%m'),
+        'categorie': 'loyer',
+    })
+    assert reponse.status_code == 302
+    return client
+
+
+def test_index(client):
+    # raiseload('*') : tout accès à une relation non chargée lèverait une erreur
+    assert client.get('/').status_code == 200
+
+
+def test_statistiques(client):
+    assert client.get('/statistiques').status_code == 200
+    assert client.get('/statistiques?annee=2024').status_code == 200